@@ -0,0 +1,36 @@
+import time
+
+from utils.logging import metrics as default_metrics
+
+
+def metered_callback(callback, sample_rate, metrics=None, report_every=100):
+    """Wrap an audio callback so it reports xruns and render load.
+
+    Output underflows flagged in `status` are counted as "xruns"; render load
+    is the time spent in `callback` over the block duration. Both are kept in
+    local state and only sent to `metrics` every `report_every` blocks, as the
+    "render_load" mean and "render_load_max" gauges, so the blocks in between
+    make no allocation and never touch the metrics queue.
+    """
+    metrics = default_metrics if metrics is None else metrics
+    # load sum, load max, blocks, xruns; report_every <= 256 keeps ints cached
+    state = [0.0, 0.0, 0, 0]
+
+    def wrapped(outdata, frames, time_info, status):
+        started = time.perf_counter()
+        if status is not None and status.output_underflow:
+            state[3] += 1
+        callback(outdata, frames, time_info, status)
+        load = (time.perf_counter() - started) * sample_rate / frames
+        state[0] += load
+        if load > state[1]:
+            state[1] = load
+        state[2] += 1
+        if state[2] >= report_every:
+            if state[3]:
+                metrics.increment("xruns", state[3])
+            metrics.gauge("render_load", state[0] / state[2])
+            metrics.gauge("render_load_max", state[1])
+            state[:] = [0.0, 0.0, 0, 0]
+
+    return wrapped
@@ -1,7 +1,10 @@
 import time
 from utils.math import adc_to_freq, adc_to_amp, adc_to_base
+from utils.logging import get_logger, metrics
 from controls.gpio import read_adc
 
+log = get_logger("pots")
+
 
 def adc_poller(
     _smoothed_freq, _smoothed_amp, _smoothed_base, _smoothed_decay, _running
@@ -18,7 +21,11 @@ def adc_poller(
         _smoothed_freq = adc_to_freq(raw_f)  # Re-enable frequency updates
         _smoothed_base = adc_to_base(raw_b)
 
-        print(
-            f"Freq: {_smoothed_freq:.2f} Hz, Amp: {_smoothed_amp:.2f}, Base: {_smoothed_base:.2f}"
-        )
+        metrics.increment("control_updates")
+        log.info(
+            "Freq: %.2f Hz, Amp: %.2f, Base: %.2f",
+            _smoothed_freq,
+            _smoothed_amp,
+            _smoothed_base,
+        )  # Rate limited, formatted on the logging thread
         time.sleep(0.01)
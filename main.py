@@ -7,12 +7,22 @@
 # from controls.oled import oled_setup, show_wave_on_oled
 # from controls.gpio import setup_spi, close_spi
 # from controls.pots import adc_poller
-# from synth.engine import audio_callback
+# from synth.engine import audio_callback, prepare_buffers, SAMPLE_RATE
+# from audio.stream import metered_callback
+# from utils.logging import setup_logging, shutdown_logging
+# from utils.realtime import (
+#     setup_process,
+#     setup_thread,
+#     realtime_callback,
+#     collect_in_gap,
+# )
 
 # import yaml
 
 # with open("config/synth.yaml", "r", encoding="utf-8") as f:
 #     config_synth = yaml.safe_load(f)
+# with open("config/audio.yaml", "r", encoding="utf-8") as f:
+#     config_realtime = yaml.safe_load(f)["realtime"]
 
 
 # # Globals
@@ -29,15 +39,20 @@
 
 
 # def main():
+#     setup_logging()
 #     setup_spi()
-#     poller = threading.Thread(
-#         target=adc_poller(
+#     def realtime_poller():
+#         setup_thread(config_realtime["control_cpus"], nice=config_realtime["control_nice"])
+#         adc_poller(
 #             _smoothed_freq, _smoothed_amp, _smoothed_base, _smoothed_decay, _running
-#         ),
-#         daemon=True,
-#     )
+#         )
+
+#     poller = threading.Thread(target=realtime_poller, daemon=True)
 #     poller.start()
 
+#     blocksize = 64
+#     prepare_buffers(blocksize)  # the callback must not allocate them
+
 #     def dynamic_audio_callback(outdata, frames, time_info, status):
 #         params = {
 #             "freq": _smoothed_freq,  # Fetch latest frequency dynamically
@@ -47,31 +62,46 @@
 #         }
 #         audio_callback(outdata, frames, time_info, status, params)
 
-#     with sd.OutputStream(
-#         channels=1,
-#         samplerate=44100,
-#         blocksize=64,
-#         dtype="float32",
-#         callback=dynamic_audio_callback,
-#     ):
-#         while True:
-#             time.sleep(0.2)
-#             # show_wave_on_oled(
-#             #     _smoothed_freq,
-#             #     _smoothed_amp,
-#             #     _smoothed_base,
-#             #     oled_width,
-#             #     oled_height,
-#             #     font,
-#             #     device,
-#             # )
-#     close_spi()
+#     # Initialization is done: freeze it and keep the GC out of the callback.
+#     # The full collection must happen before the stream (and its callback) starts.
+#     setup_process(config_realtime["gc_thresholds"], config_realtime["gc_disable"])
+
+#     try:
+#         with sd.OutputStream(
+#             channels=1,
+#             samplerate=SAMPLE_RATE,
+#             blocksize=blocksize,
+#             dtype="float32",
+#             callback=realtime_callback(
+#                 metered_callback(dynamic_audio_callback, SAMPLE_RATE),
+#                 config_realtime["audio_cpus"],
+#                 config_realtime["audio_priority"],
+#             ),
+#         ):
+#             setup_thread(config_realtime["control_cpus"], nice=config_realtime["control_nice"])
+#             while True:
+#                 time.sleep(0.2)
+#                 collect_in_gap()
+#                 # show_wave_on_oled(
+#                 #     _smoothed_freq,
+#                 #     _smoothed_amp,
+#                 #     _smoothed_base,
+#                 #     oled_width,
+#                 #     oled_height,
+#                 #     font,
+#                 #     device,
+#                 # )
+#     finally:
+#         close_spi()
+#         shutdown_logging()
 
 import numpy as np
 import sounddevice as sd
 
-def main():
+from utils.logging import setup_logging, shutdown_logging
 
+def main():
+    setup_logging()
 
     # Parameters
     freq = 2000.0       # Frequency in Hz
@@ -84,8 +114,11 @@ def main():
     wave = amplitude * np.sin(2 * np.pi * freq * t)  # 0.5 = amplitude to avoid clipping
 
     # Play the wave
-    sd.play(wave, samplerate)
-    sd.wait()  # Wait until sound finishes
+    try:
+        sd.play(wave, samplerate)
+        sd.wait()  # Wait until sound finishes
+    finally:
+        shutdown_logging()
 
 if __name__ == "__main__":
     main()
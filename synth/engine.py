@@ -9,10 +9,40 @@ with open("config/synth.yaml", "r", encoding="utf-8") as f:
 
 SAMPLE_RATE = config_audio["sample_rate"]
 TABLE_SIZE = config_audio["table_size"]
+BLOCK_SIZE = config_audio["block_size"]
 N_PARTIALS = config_synth["partials_per_voice"]
 
 sine_table = np.sin(2.0 * np.pi * np.arange(TABLE_SIZE) / TABLE_SIZE).astype(np.float32)
 
+# Work buffers per block size, so the audio callback never allocates arrays
+_work_buffers = {}
+
+
+def prepare_buffers(frames):
+    """Preallocate (once) the work buffers used to render blocks of `frames`.
+
+    Call it for the stream's block size before the stream starts: the audio
+    callback only looks buffers up and refuses block sizes it was not given.
+    """
+    buffers = _work_buffers.get(frames)
+    if buffers is None:
+        buffers = (
+            np.arange(frames, dtype=np.float64).reshape(-1, 1),  # sample ramp
+            np.empty((frames, 1), dtype=np.float64),  # table positions
+            np.empty((frames, 1), dtype=np.int64),  # table indexes
+            np.empty((frames, 1), dtype=np.float32),  # partial samples
+            np.empty((frames, 1), dtype=np.float32),  # mono mix
+            # 0-d scalars: ufuncs convert Python floats to arrays on every call
+            np.empty((), dtype=np.float64),  # table step
+            np.empty((), dtype=np.float64),  # start phase
+            np.empty((), dtype=np.float32),  # partial amplitude
+        )
+        _work_buffers[frames] = buffers
+    return buffers
+
+
+prepare_buffers(BLOCK_SIZE)
+
 
 def audio_callback(
     outdata, frames, _, __, params
@@ -22,17 +52,36 @@ def audio_callback(
     base = params["base"]
     decay = params["decay"]
 
-    samples = np.zeros(frames, dtype=np.float32)
-    phase = params.get("_phase", 0.0)  # Use phase from params
+    buffers = _work_buffers.get(frames)
+    if buffers is None:
+        raise ValueError(f"call prepare_buffers({frames}) before starting the stream")
+    ramp, positions, idxs, partial, mix, step, start, gain = buffers
+    # Every partial keeps its own phase so it runs on across blocks; the list
+    # is created once, on the first block of a voice
+    phases = params.get("_phases")
+    if phases is None or len(phases) != N_PARTIALS:
+        phases = params["_phases"] = [params.get("_phase", 0.0)] * N_PARTIALS
 
-    for n in range(N_PARTIALS):
+    # Everything below writes in place, passes `out` positionally and loops
+    # with `while` (a range iterator is an allocation): the callback makes no
+    # allocation at all, which tests/alloc_check.py enforces. Partials are
+    # mixed in mono first: broadcasting them into `outdata` would buffer
+    mix.fill(0.0)
+    n = 0
+    while n < N_PARTIALS:
         partial_freq = freq * (base**n)
-        partial_amp = amp / (decay**n)
-        step = (partial_freq * TABLE_SIZE) / SAMPLE_RATE
-        idxs = (phase + step * np.arange(frames)).astype(np.int64) % TABLE_SIZE
-        samples += sine_table[idxs] * partial_amp
-
-    outdata[:] = samples.reshape(-1, 1)
-    params["_phase"] = (
-        phase + (freq * TABLE_SIZE / SAMPLE_RATE) * frames
-    ) % TABLE_SIZE  # Update phase in params
+        partial_step = (partial_freq * TABLE_SIZE) / SAMPLE_RATE
+        gain.fill(amp / (decay**n))
+        step.fill(partial_step)
+        start.fill(phases[n])
+        np.multiply(ramp, step, positions)
+        np.add(positions, start, positions)
+        np.copyto(idxs, positions, casting="unsafe")
+        sine_table.take(idxs, 0, partial, "wrap")
+        np.multiply(partial, gain, partial)
+        np.add(mix, partial, mix)
+        phases[n] = (phases[n] + partial_step * frames) % TABLE_SIZE
+        n += 1
+    np.copyto(outdata, mix)
+
+    params["_phase"] = phases[0]  # Fundamental phase, kept in params
@@ -0,0 +1,60 @@
+import tracemalloc
+
+import numpy as np
+
+NUMPY_DATA = tracemalloc.DomainFilter(True, np.lib.tracemalloc_domain)
+
+
+def check_no_allocation(
+    callback, params, frames, blocks=1000, channels=1, warmup=100
+):
+    """Run `callback` for `blocks` blocks under tracemalloc.
+
+    Raises AssertionError if any block makes a single traced allocation, even
+    one freed before the callback returns: the block's tracemalloc peak must
+    not rise above the memory in use before it. Numpy data buffers still alive
+    at the end are listed with their tracebacks.
+    """
+    outdata = np.zeros((frames, channels), dtype=np.float32)
+    # One extra leading measurement primes the loop's own locals
+    peaks = [0] * (blocks + 1)
+    get_traced_memory = tracemalloc.get_traced_memory
+    reset_peak = tracemalloc.reset_peak
+
+    was_tracing = tracemalloc.is_tracing()
+    if not was_tracing:
+        tracemalloc.start(8)
+    try:
+        # Warm up so one-off state and interpreter caches exist before measuring
+        for _ in range(warmup):
+            callback(outdata, frames, None, None, params)
+        before_buffers = tracemalloc.take_snapshot()
+        # The loop itself must not allocate between reading the baseline and
+        # reading the peak: no iterator, no tuple unpacking, results in a
+        # preallocated list
+        block = 0
+        while block <= blocks:
+            before = get_traced_memory()[0]
+            reset_peak()
+            callback(outdata, frames, None, None, params)
+            peaks[block] = get_traced_memory()[1] - before
+            block += 1
+        after_buffers = tracemalloc.take_snapshot()
+    finally:
+        if not was_tracing:
+            tracemalloc.stop()
+
+    allocating = [(block, peak) for block, peak in enumerate(peaks[1:]) if peak > 0]
+    assert not allocating, (
+        f"render path allocated in {len(allocating)} of {blocks} blocks, "
+        f"first in block {allocating[0][0]} ({allocating[0][1]} B)"
+        if allocating
+        else ""
+    )
+    new_buffers = after_buffers.filter_traces([NUMPY_DATA]).compare_to(
+        before_buffers.filter_traces([NUMPY_DATA]), "traceback"
+    )
+    leaked = [stat for stat in new_buffers if stat.size_diff > 0]
+    assert not leaked, "render path kept numpy buffers:\n" + "\n".join(
+        "\n".join(stat.traceback.format()) for stat in leaked
+    )
@@ -0,0 +1,284 @@
+"""Soak test: drive the engine faster than real time for simulated hours.
+
+    python -m tests.soak --hours 4 --report soak_report.json
+
+Pots are swept through a fake ADC and presets are switched periodically. The
+run tracks RSS growth, render latency drift, phase drift against an exact
+reference, the pitch measured from the rendered audio, output error against
+an analytic sine, and NaN/denormal samples, then writes a JSON summary. Exits
+non-zero if any check fails.
+"""
+
+import argparse
+import json
+import math
+import os
+import sys
+import time
+from fractions import Fraction
+
+import numpy as np
+
+from synth import engine
+from utils.math import adc_to_amp, adc_to_base, adc_to_freq
+
+CONTROL_PERIOD = 0.01  # adc_poller sleeps 10 ms between reads
+TINY = np.finfo(np.float32).tiny
+
+# Parameter sets the run switches between, standing in for real presets
+SOAK_PRESETS = [{"decay": 2.0}, {"decay": 1.2}, {"decay": 4.0}]
+
+
+class FakeADC:
+    """MCP3008 stand-in that sweeps each channel with a triangle wave."""
+
+    def __init__(self, periods=(7.0, 13.0, 29.0)):
+        self.periods = periods
+        self.time = 0.0
+
+    def read_adc(self, channel: int) -> int:
+        if not 0 <= channel < len(self.periods):
+            return 0
+        position = (self.time / self.periods[channel]) % 1.0
+        return int(round(1023 * (1.0 - abs(2.0 * position - 1.0))))
+
+
+def rss_bytes():
+    """Current resident set size, or None where /proc is not available."""
+    try:
+        with open("/proc/self/statm", "r", encoding="utf-8") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except OSError:
+        return None
+
+
+def partial_increments(params, frames):
+    """Exact table advance of each partial over one block."""
+    scale = Fraction(engine.TABLE_SIZE * frames, engine.SAMPLE_RATE)
+    freq, base = Fraction(params["freq"]), Fraction(params["base"])
+    return [freq * base**n * scale for n in range(engine.N_PARTIALS)]
+
+
+def analytic_block(params, phases, frames):
+    """Additive sines, each partial running from its own exact phase."""
+    k = np.arange(frames)
+    samples = np.zeros(frames)
+    for n, phase in enumerate(phases):
+        step = params["freq"] * (params["base"] ** n) * engine.TABLE_SIZE
+        step /= engine.SAMPLE_RATE
+        amp = params["amp"] / (params["decay"] ** n)
+        samples += amp * np.sin(2.0 * np.pi * (phase + step * k) / engine.TABLE_SIZE)
+    return samples
+
+
+def estimate_pitch(samples, sample_rate):
+    """Frequency of the strongest spectral peak, refined by log-parabolic fit."""
+    samples = samples - np.mean(samples)
+    size = 1 << (4 * len(samples) - 1).bit_length()  # zero-pad for resolution
+    spectrum = np.abs(np.fft.rfft(samples * np.hanning(len(samples)), size))
+    peak = int(np.argmax(spectrum[1:-1])) + 1
+    left, centre, right = np.log(spectrum[peak - 1 : peak + 2] + 1e-30)
+    offset = 0.5 * (left - right) / (left - 2.0 * centre + right)
+    return (peak + offset) * sample_rate / size
+
+
+def measure_pitch(params, frames, probe):
+    """Render `probe` from a copy of the current state and estimate its pitch.
+
+    Returns None when the probe is silent (amplitude pot at zero).
+    """
+    state = dict(params)
+    if "_phases" in state:  # the engine advances this list in place
+        state["_phases"] = list(state["_phases"])
+    for start in range(0, len(probe), frames):
+        engine.audio_callback(probe[start : start + frames], frames, None, None, state)
+    if not np.any(probe):
+        return None
+    return estimate_pitch(probe[:, 0], engine.SAMPLE_RATE)
+
+
+def _wrapped(diff):
+    """Map a table position difference to [-TABLE_SIZE / 2, TABLE_SIZE / 2)."""
+    half = engine.TABLE_SIZE / 2
+    return (diff + half) % engine.TABLE_SIZE - half
+
+
+def run_soak(
+    hours=1.0,
+    frames=engine.BLOCK_SIZE,
+    preset_period=60.0,
+    check_every=100,
+    rss_every=10.0,
+    pitch_every=5.0,
+    pitch_window=0.25,
+    windows=10,
+    adc=None,
+    presets=None,
+):
+    """Render `hours` of simulated audio and return a summary report."""
+    adc = FakeADC() if adc is None else adc
+    presets = SOAK_PRESETS if presets is None else presets
+    block_time = frames / engine.SAMPLE_RATE
+    n_blocks = max(1, int(hours * 3600 / block_time))
+    table = engine.TABLE_SIZE
+
+    engine.prepare_buffers(frames)
+    params = {"freq": 110.0, "amp": 0.05, "base": 0.0, "decay": 2.0}
+    outdata = np.zeros((frames, 1), dtype=np.float32)
+    # Latency is summed per window of the run so the harness itself stays flat
+    window_sums = [0.0] * windows
+    window_counts = [0] * windows
+    latency_max = 0.0
+    probe = np.empty((max(1, int(pitch_window / block_time)) * frames, 1), np.float32)
+    rss = [rss_bytes()]
+    ref_phases = [Fraction(0)] * engine.N_PARTIALS
+
+    # Largest error a truncated table lookup can make, per unit amplitude
+    lookup_error = 2.0 * np.pi / table
+    stats = {
+        "nan_blocks": 0,
+        "denormal_blocks": 0,
+        "max_phase_drift_cycles": 0.0,
+        "max_pitch_error_cents": 0.0,
+        "pitch_checks": 0,
+        "max_sample_error": 0.0,
+        "max_sample_error_ratio": 0.0,
+        "preset_switches": 0,
+    }
+
+    next_control = next_preset = next_rss = next_pitch = 0.0
+    preset_index = -1
+    started = time.perf_counter()
+    for block in range(n_blocks):
+        now = block * block_time
+        if now >= next_preset:
+            preset_index = (preset_index + 1) % len(presets)
+            params.update(presets[preset_index])
+            stats["preset_switches"] += 1
+            next_preset += preset_period
+        if now >= next_control:
+            adc.time = now
+            params["amp"] = adc_to_amp(adc.read_adc(0))
+            params["freq"] = adc_to_freq(adc.read_adc(1))
+            params["base"] = adc_to_base(adc.read_adc(2))
+            next_control += CONTROL_PERIOD
+        if now >= next_pitch:
+            pitch = measure_pitch(params, frames, probe)
+            if pitch is not None:
+                cents = abs(1200.0 * math.log2(pitch / params["freq"]))
+                stats["max_pitch_error_cents"] = max(
+                    stats["max_pitch_error_cents"], cents
+                )
+                stats["pitch_checks"] += 1
+            next_pitch += pitch_every
+        if now >= next_rss:  # after the first pitch check has set up the FFT
+            rss.append(rss_bytes())
+            next_rss += rss_every
+
+        tick = time.perf_counter()
+        engine.audio_callback(outdata, frames, None, None, params)
+        latency = time.perf_counter() - tick
+        window = block * windows // n_blocks
+        window_sums[window] += latency
+        window_counts[window] += 1
+        latency_max = max(latency_max, latency)
+
+        if not np.isfinite(outdata).all():
+            stats["nan_blocks"] += 1
+        elif np.any((outdata != 0.0) & (np.abs(outdata) < TINY)):
+            stats["denormal_blocks"] += 1
+
+        if block % check_every == 0:
+            expected = analytic_block(params, [float(p) for p in ref_phases], frames)
+            error = float(np.max(np.abs(outdata[:, 0] - expected)))
+            bound = sum(
+                params["amp"] / (params["decay"] ** n) for n in range(engine.N_PARTIALS)
+            )
+            stats["max_sample_error"] = max(stats["max_sample_error"], error)
+            if bound > 0:
+                stats["max_sample_error_ratio"] = max(
+                    stats["max_sample_error_ratio"], error / (bound * lookup_error)
+                )
+
+        ref_phases = [
+            (phase + increment) % table
+            for phase, increment in zip(ref_phases, partial_increments(params, frames))
+        ]
+        drift = abs(_wrapped(params["_phase"] - float(ref_phases[0]))) / table
+        stats["max_phase_drift_cycles"] = max(stats["max_phase_drift_cycles"], drift)
+
+    wall = time.perf_counter() - started
+    rss.append(rss_bytes())
+    rss_start = rss[1] if len(rss) > 1 else rss[0]
+
+    means = [total / count for total, count in zip(window_sums, window_counts) if count]
+    first, last = means[0], means[-1]
+    report = {
+        "simulated_seconds": n_blocks * block_time,
+        "wall_seconds": wall,
+        "speedup": n_blocks * block_time / wall if wall > 0 else float("inf"),
+        "blocks": n_blocks,
+        "frames": frames,
+        "rss_start_bytes": rss_start,
+        "rss_end_bytes": rss[-1],
+        "rss_growth_bytes": None if rss_start is None else rss[-1] - rss_start,
+        "latency_mean_s": sum(window_sums) / n_blocks,
+        "latency_max_s": latency_max,
+        "latency_first_window_s": first,
+        "latency_last_window_s": last,
+        "latency_drift_ratio": last / first if first > 0 else 1.0,
+        "block_budget_s": block_time,
+    }
+    report.update(stats)
+    return report
+
+
+def check_report(
+    report,
+    max_rss_growth=8 * 1024 * 1024,
+    max_latency_drift=2.0,
+    max_phase_drift=1e-6,
+    max_pitch_error=0.1,
+    max_sample_error_ratio=1.1,
+):
+    """Return the list of failed checks, empty when the soak passed."""
+    failures = []
+    if report["nan_blocks"]:
+        failures.append(f"{report['nan_blocks']} blocks with NaN/inf samples")
+    if report["denormal_blocks"]:
+        failures.append(f"{report['denormal_blocks']} blocks with denormal samples")
+    if report["rss_growth_bytes"] is None:
+        pass  # RSS is unavailable on this platform, reported as null
+    elif report["rss_growth_bytes"] > max_rss_growth:
+        failures.append(f"RSS grew by {report['rss_growth_bytes']} B")
+    if report["latency_drift_ratio"] > max_latency_drift:
+        failures.append(f"latency drifted by x{report['latency_drift_ratio']:.2f}")
+    if report["max_phase_drift_cycles"] > max_phase_drift:
+        failures.append(f"phase drifted {report['max_phase_drift_cycles']:g} cycles")
+    if report["max_pitch_error_cents"] > max_pitch_error:
+        failures.append(f"pitch off by {report['max_pitch_error_cents']:g} cents")
+    if report["max_sample_error_ratio"] > max_sample_error_ratio:
+        failures.append(
+            f"output off the analytic sine by {report['max_sample_error']:g}"
+        )
+    return failures
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--hours", type=float, default=1.0)
+    parser.add_argument("--frames", type=int, default=engine.BLOCK_SIZE)
+    parser.add_argument("--preset-period", type=float, default=60.0)
+    parser.add_argument("--report", default="soak_report.json")
+    args = parser.parse_args(argv)
+
+    report = run_soak(args.hours, args.frames, args.preset_period)
+    report["failures"] = check_report(report)
+    with open(args.report, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(json.dumps(report, indent=2))
+    return 1 if report["failures"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,125 @@
+import numpy as np
+import pytest
+
+from synth import engine
+from tests.alloc_check import check_no_allocation
+
+BLOCK_SIZES = [64, engine.BLOCK_SIZE]
+
+
+def _params():
+    return {"freq": 440.0, "amp": 0.5, "base": 1.5, "decay": 2.0}
+
+
+def _reference_callback(outdata, frames, params):
+    # Allocating implementation the engine is expected to match
+    phases = params.setdefault("_ref_phases", [0.0] * engine.N_PARTIALS)
+    samples = np.zeros(frames, dtype=np.float32)
+    for n in range(engine.N_PARTIALS):
+        step = (params["freq"] * (params["base"] ** n) * engine.TABLE_SIZE) / (
+            engine.SAMPLE_RATE
+        )
+        idxs = (phases[n] + step * np.arange(frames)).astype(np.int64)
+        idxs %= engine.TABLE_SIZE
+        samples += engine.sine_table[idxs] * (params["amp"] / (params["decay"] ** n))
+        phases[n] = (phases[n] + step * frames) % engine.TABLE_SIZE
+    outdata[:] = samples.reshape(-1, 1)
+    params["_phase"] = phases[0]
+
+
+@pytest.mark.parametrize("frames", BLOCK_SIZES)
+@pytest.mark.parametrize("n_partials", [1, 6])
+def test_audio_callback_matches_reference(monkeypatch, n_partials, frames):
+    monkeypatch.setattr(engine, "N_PARTIALS", n_partials)
+    engine.prepare_buffers(frames)
+    params, ref_params = _params(), _params()
+    out = np.empty((frames, 1), dtype=np.float32)
+    ref = np.empty((frames, 1), dtype=np.float32)
+    for _ in range(50):
+        engine.audio_callback(out, frames, None, None, params)
+        _reference_callback(ref, frames, ref_params)
+        np.testing.assert_array_equal(out, ref)
+    assert params["_phase"] == ref_params["_phase"]
+
+
+def test_partials_run_on_across_blocks(monkeypatch):
+    monkeypatch.setattr(engine, "N_PARTIALS", 6)
+    engine.prepare_buffers(64)
+    engine.prepare_buffers(128)
+    split, whole = _params(), _params()
+    two_blocks = np.empty((128, 1), dtype=np.float32)
+    one_block = np.empty((128, 1), dtype=np.float32)
+    engine.audio_callback(two_blocks[:64], 64, None, None, split)
+    engine.audio_callback(two_blocks[64:], 64, None, None, split)
+    engine.audio_callback(one_block, 128, None, None, whole)
+    # Only a truncated index may differ, by one table step
+    assert np.max(np.abs(two_blocks - one_block)) < 4.0 * np.pi / engine.TABLE_SIZE
+    np.testing.assert_allclose(split["_phases"], whole["_phases"])
+
+
+def test_audio_callback_fills_every_channel():
+    frames = engine.BLOCK_SIZE
+    out = np.full((frames, 2), np.nan, dtype=np.float32)
+    engine.audio_callback(out, frames, None, None, _params())
+    np.testing.assert_array_equal(out[:, 0], out[:, 1])
+    assert np.isfinite(out).all()
+
+
+def test_audio_callback_refuses_unprepared_block_size():
+    out = np.empty((17, 1), dtype=np.float32)
+    with pytest.raises(ValueError, match="prepare_buffers"):
+        engine.audio_callback(out, 17, None, None, _params())
+
+
+@pytest.mark.parametrize("frames", BLOCK_SIZES)
+@pytest.mark.parametrize("n_partials", [1, 6])
+def test_audio_callback_does_not_allocate(monkeypatch, n_partials, frames):
+    monkeypatch.setattr(engine, "N_PARTIALS", n_partials)
+    engine.prepare_buffers(frames)
+    check_no_allocation(engine.audio_callback, _params(), frames)
+
+
+@pytest.mark.parametrize("frames", BLOCK_SIZES)
+def test_alloc_check_catches_allocating_callback(frames):
+    def allocating_callback(outdata, frames, _, __, params):
+        _reference_callback(outdata, frames, params)
+
+    with pytest.raises(AssertionError):
+        check_no_allocation(allocating_callback, _params(), frames)
+
+
+def test_audio_callback_does_not_allocate_in_stereo():
+    engine.prepare_buffers(64)
+    check_no_allocation(engine.audio_callback, _params(), 64, channels=2)
+
+
+@pytest.mark.parametrize("frames", BLOCK_SIZES)
+@pytest.mark.parametrize(
+    "temporary",
+    [lambda: np.zeros(1), lambda: np.zeros(48), lambda: [0.0] * 8],
+    ids=["zeros(1)", "zeros(48)", "list"],
+)
+def test_alloc_check_catches_temporary(frames, temporary):
+    engine.prepare_buffers(frames)
+
+    def temporary_callback(outdata, frames, _, __, params):
+        engine.audio_callback(outdata, frames, None, None, params)
+        temporary()
+
+    with pytest.raises(AssertionError, match="allocated in 1000 of 1000 blocks"):
+        check_no_allocation(temporary_callback, _params(), frames)
+
+
+def test_alloc_check_catches_kept_buffer():
+    engine.prepare_buffers(64)
+    calls, kept = [0], []
+
+    def keeping_callback(outdata, frames, _, __, params):
+        engine.audio_callback(outdata, frames, None, None, params)
+        if calls[0] < 15:  # stop counting before ints stop being cached
+            calls[0] += 1
+            if calls[0] == 15:  # past the warm-up
+                kept.append(np.empty(8))
+
+    with pytest.raises(AssertionError, match="render path allocated in"):
+        check_no_allocation(keeping_callback, _params(), 64, warmup=10)
@@ -0,0 +1,102 @@
+import io
+import logging
+import queue
+import threading
+
+import pytest
+
+from utils import logging as xlogging
+
+
+@pytest.fixture(name="stream")
+def fixture_stream():
+    stream = io.StringIO()
+    xlogging.setup_logging(level=logging.DEBUG, rate_limit=60.0, stream=stream)
+    yield stream
+    xlogging.shutdown_logging()
+
+
+def test_records_are_written_by_listener(stream):
+    xlogging.get_logger("test").info("hello %s", "world")
+    xlogging.shutdown_logging()
+    assert "INFO xenosynth.test: hello world" in stream.getvalue()
+
+
+def test_records_are_queued_unformatted():
+    formatted = []
+
+    class Probe:
+        def __str__(self):
+            formatted.append(True)
+            return "probe"
+
+    handler = xlogging.DroppingQueueHandler(queue.Queue())
+    logger = logging.getLogger("xenosynth.test.unformatted")
+    logger.propagate = False
+    logger.addHandler(handler)
+    try:
+        logger.warning("%s", Probe())
+    finally:
+        logger.removeHandler(handler)
+    record = handler.queue.get_nowait()
+    assert not formatted
+    assert record.getMessage() == "probe"
+
+
+def test_rate_limit_is_per_key(stream):
+    log = xlogging.get_logger("test")
+    for value in range(100):
+        log.info("value %d", value)
+        log.info("other %d", value, extra={"key": "other"})
+    log.info("unlimited", extra={"key": None})
+    log.info("unlimited", extra={"key": None})
+    xlogging.shutdown_logging()
+    output = stream.getvalue()
+    assert output.count("value ") == 1
+    assert output.count("other ") == 1
+    assert output.count("unlimited") == 2
+
+
+def test_full_queue_drops_instead_of_blocking():
+    handler = xlogging.DroppingQueueHandler(queue.Queue(2))
+    logger = logging.getLogger("xenosynth.test.dropping")
+    logger.propagate = False
+    logger.addHandler(handler)
+    try:
+        for value in range(10):
+            logger.warning("value %d", value)
+    finally:
+        logger.removeHandler(handler)
+    assert handler.queue.qsize() == 2
+    assert handler.dropped == 8
+
+
+def test_metrics_aggregate_counters_and_gauges():
+    metrics = xlogging.Metrics(interval=60.0)
+    metrics.increment("xruns")  # ignored while stopped
+    metrics.start()
+    metrics.increment("xruns")
+    metrics.increment("control_updates", 3)
+    metrics.gauge("render_load", 0.5)
+    metrics.gauge("render_load", 0.25)
+    metrics.stop()
+    snapshot = metrics.snapshot()
+    assert snapshot["xruns"] == 1
+    assert snapshot["control_updates"] == 3
+    assert snapshot["control_updates_rate"] > 0
+    assert snapshot["render_load"] == 0.25
+    assert snapshot["metrics_dropped"] == 0
+
+
+def test_metrics_drop_when_queue_is_full():
+    metrics = xlogging.Metrics(maxsize=1, interval=60.0)
+    metrics._thread = threading.current_thread()  # pylint: disable=W0212
+    for _ in range(5):
+        metrics.increment("xruns")
+    assert metrics.dropped == 4
+
+
+def test_metrics_are_logged(stream):
+    xlogging.metrics.increment("xruns", 2)
+    xlogging.shutdown_logging()
+    assert "xruns=2" in stream.getvalue()
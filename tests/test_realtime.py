@@ -0,0 +1,138 @@
+import gc
+import io
+import os
+import threading
+import weakref
+
+import pytest
+
+from utils import logging as xlogging
+from utils import realtime
+
+
+@pytest.fixture(name="restore_gc")
+def fixture_restore_gc():
+    thresholds, enabled = gc.get_threshold(), gc.isenabled()
+    yield
+    gc.unfreeze()
+    gc.set_threshold(*thresholds)
+    if enabled:
+        gc.enable()
+
+
+def test_setup_process_freezes_and_tunes_gc(restore_gc):  # pylint: disable=W0613
+    report = realtime.setup_process(gc_thresholds=(50000, 50, 100))
+    assert report["gc_frozen"] > 0
+    assert report["gc_thresholds"] == (50000, 50, 100)
+    assert report["gc_enabled"]
+    assert realtime.collect_in_gap() == 0
+
+
+def test_setup_process_can_pause_gc(restore_gc):  # pylint: disable=W0613
+    report = realtime.setup_process(gc_disable=True)
+    assert not report["gc_enabled"]
+    assert not gc.isenabled()
+    assert realtime.collect_in_gap() >= 0
+
+
+@pytest.mark.skipif(not hasattr(os, "sched_setaffinity"), reason="Linux only")
+def test_set_affinity_pins_only_the_calling_thread():
+    allowed = sorted(os.sched_getaffinity(0))
+    result = {}
+
+    def pin():
+        result["affinity"] = realtime.set_affinity(allowed[:1])
+
+    thread = threading.Thread(target=pin)
+    thread.start()
+    thread.join()
+    assert result["affinity"] == allowed[:1]
+    assert sorted(os.sched_getaffinity(0)) == allowed
+
+
+def test_set_affinity_reports_failure(monkeypatch):
+    def fail(_, __):
+        raise PermissionError("not permitted")
+
+    monkeypatch.setattr(os, "sched_setaffinity", fail, raising=False)
+    assert realtime.set_affinity([0]).startswith("unchanged (PermissionError")
+
+
+def test_set_affinity_unsupported(monkeypatch):
+    monkeypatch.delattr(os, "sched_setaffinity", raising=False)
+    assert realtime.set_affinity([0]) == "unsupported"
+
+
+def test_set_priority_falls_back_to_nice(monkeypatch):
+    def fail(_, __, ___):
+        raise PermissionError("not permitted")
+
+    niceness = [0]
+
+    def fake_nice(increment):
+        niceness[0] += increment
+        return niceness[0]
+
+    monkeypatch.setattr(os, "sched_setscheduler", fail, raising=False)
+    monkeypatch.setattr(os, "nice", fake_nice)
+    assert realtime.set_priority(priority=70, nice=-5) == "nice:-5"
+
+
+def test_set_priority_reports_when_nothing_applied(monkeypatch):
+    def fail(*_):
+        raise PermissionError("not permitted")
+
+    monkeypatch.setattr(os, "sched_setscheduler", fail, raising=False)
+    monkeypatch.setattr(os, "nice", fail)
+    assert realtime.set_priority(priority=70, nice=-5) == (
+        "unchanged (SCHED_FIFO PermissionError, nice PermissionError)"
+    )
+    assert realtime.set_priority() == "unchanged"
+
+
+def test_realtime_callback_sets_up_thread_once(monkeypatch):
+    calls = []
+    monkeypatch.setattr(
+        realtime, "setup_thread", lambda *args: calls.append(args) or {"thread": "a"}
+    )
+    blocks = []
+    wrapped = realtime.realtime_callback(
+        lambda *args: blocks.append(args), cpus=[0], priority=70
+    )
+    for _ in range(3):
+        wrapped("out", 64, None, None)
+    assert calls == [([0], 70, None)]
+    assert len(blocks) == 3
+    assert wrapped.report == {"thread": "a"}
+
+
+def test_every_thread_report_is_logged():
+    stream = io.StringIO()
+    xlogging.setup_logging(rate_limit=60.0, stream=stream)
+    try:
+        threads = [threading.Thread(target=realtime.setup_thread) for _ in range(3)]
+        for thread in threads:
+            thread.start()
+            thread.join()
+    finally:
+        xlogging.shutdown_logging()
+    assert stream.getvalue().count("thread realtime settings") == 3
+
+
+def test_collect_in_gap_frees_promoted_cycles(restore_gc):  # pylint: disable=W0613
+    class Node:
+        pass
+
+    realtime.setup_process(gc_thresholds=(700, 10, 10), gc_disable=True)
+    node = Node()
+    node.self = node
+    alive = weakref.ref(node)
+    gc.collect(1)  # survivors of generation 1 are promoted to the oldest one
+    assert any(obj is node for obj in gc.get_objects(generation=2))
+    del node
+
+    for _ in range(200):
+        realtime.collect_in_gap()
+        if alive() is None:
+            break
+    assert alive() is None
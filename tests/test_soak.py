@@ -0,0 +1,87 @@
+import json
+
+import numpy as np
+
+from synth import engine
+from tests import soak
+
+
+def test_fake_adc_sweeps_full_range():
+    adc = soak.FakeADC(periods=(1.0,))
+    values = []
+    for step in range(100):
+        adc.time = step / 100
+        values.append(adc.read_adc(0))
+    assert min(values) == 0
+    assert max(values) == 1023
+    assert adc.read_adc(5) == 0
+
+
+def test_estimate_pitch_of_pure_sine():
+    t = np.arange(11025) / 44100
+    for freq in (100.0, 440.0, 1999.0):
+        pitch = soak.estimate_pitch(np.sin(2.0 * np.pi * freq * t + 0.3), 44100)
+        assert abs(pitch - freq) < 0.01
+
+
+def test_short_soak_passes():
+    report = soak.run_soak(
+        hours=30 / 3600, preset_period=10.0, presets=[{"decay": 2.0}, {"decay": 1.2}]
+    )
+    assert report["speedup"] > 1.0
+    assert report["preset_switches"] == 3
+    assert report["pitch_checks"] > 0
+    assert report["max_sample_error"] > 0
+    # Wall-clock latency drift is too noisy to assert on shared runners
+    assert soak.check_report(report, max_latency_drift=float("inf")) == []
+
+
+def test_soak_passes_with_six_partials(monkeypatch):
+    monkeypatch.setattr(engine, "N_PARTIALS", 6)
+    report = soak.run_soak(hours=30 / 3600, check_every=10, pitch_every=1.0)
+    assert report["pitch_checks"] > 0
+    assert soak.check_report(report, max_latency_drift=float("inf")) == []
+
+
+def test_rss_is_reported_as_unavailable_without_proc(monkeypatch):
+    monkeypatch.setattr(soak, "rss_bytes", lambda: None)
+    report = soak.run_soak(hours=1 / 3600)
+    assert report["rss_growth_bytes"] is None
+    assert not any("RSS" in failure for failure in soak.check_report(report))
+
+
+def test_soak_detects_rendered_pitch_error(monkeypatch):
+    render = engine.audio_callback
+
+    def sharp_callback(outdata, frames, time_info, status, params):
+        freq = params["freq"]
+        params["freq"] = freq * 1.01
+        render(outdata, frames, time_info, status, params)
+        params["freq"] = freq
+
+    monkeypatch.setattr(engine, "audio_callback", sharp_callback)
+    report = soak.run_soak(hours=2 / 3600, pitch_every=1.0)
+    assert 15.0 < report["max_pitch_error_cents"] < 20.0
+    assert any("pitch" in failure for failure in soak.check_report(report))
+
+
+def test_check_report_flags_degradation():
+    report = soak.run_soak(hours=1 / 3600)
+    report.update(
+        nan_blocks=2,
+        denormal_blocks=1,
+        rss_growth_bytes=64 * 1024 * 1024,
+        latency_drift_ratio=3.0,
+        max_phase_drift_cycles=0.01,
+        max_pitch_error_cents=5.0,
+        max_sample_error_ratio=2.0,
+    )
+    assert len(soak.check_report(report)) == 7
+
+
+def test_main_writes_report(tmp_path):
+    path = tmp_path / "report.json"
+    status = soak.main(["--hours", str(1 / 3600), "--report", str(path)])
+    report = json.loads(path.read_text(encoding="utf-8"))
+    assert status == (1 if report["failures"] else 0)
+    assert report["blocks"] > 0
@@ -0,0 +1,49 @@
+from types import SimpleNamespace
+
+import numpy as np
+
+from audio.stream import metered_callback
+from synth import engine
+from tests.alloc_check import check_no_allocation
+from utils.logging import Metrics
+
+
+def test_metered_callback_reports_xruns_and_render_load():
+    metrics = Metrics(interval=60.0)
+    rendered = []
+    wrapped = metered_callback(
+        lambda outdata, frames, time_info, status: rendered.append(frames),
+        44100,
+        metrics,
+        report_every=3,
+    )
+    out = np.zeros((64, 1), dtype=np.float32)
+    metrics.start()
+    wrapped(out, 64, None, SimpleNamespace(output_underflow=True))
+    wrapped(out, 64, None, SimpleNamespace(output_underflow=False))
+    assert metrics.snapshot() == {}
+    wrapped(out, 64, None, None)
+    wrapped(out, 64, None, SimpleNamespace(output_underflow=True))
+    metrics.stop()
+
+    snapshot = metrics.snapshot()
+    assert rendered == [64, 64, 64, 64]
+    assert snapshot["xruns"] == 1  # the fourth block is not reported yet
+    assert 0.0 < snapshot["render_load"] <= snapshot["render_load_max"] < 1.0
+
+
+def test_metered_callback_does_not_allocate_between_reports():
+    engine.prepare_buffers(64)
+    params = {"freq": 440.0, "amp": 0.5, "base": 1.5, "decay": 2.0}
+
+    def render(outdata, frames, time_info, status):
+        engine.audio_callback(outdata, frames, time_info, status, params)
+
+    wrapped = metered_callback(render, engine.SAMPLE_RATE, report_every=200)
+
+    def callback(outdata, frames, time_info, status, _):
+        wrapped(outdata, frames, time_info, status)
+
+    # warm-up and measured blocks stay under one report: only the blocks in
+    # between reports are checked
+    check_no_allocation(callback, params, 64, blocks=150, warmup=40)
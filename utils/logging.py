@@ -0,0 +1,213 @@
+import logging
+import logging.handlers
+import queue
+import sys
+import threading
+import time
+
+LOGGER_NAME = "xenosynth"
+LOG_FORMAT = "%(asctime)s %(levelname)s %(name)s: %(message)s"
+
+
+def get_logger(name=None):
+    if name is None:
+        return logging.getLogger(LOGGER_NAME)
+    return logging.getLogger(f"{LOGGER_NAME}.{name}")
+
+
+class RateLimitFilter(logging.Filter):
+    """Let through at most one record per key every `interval` seconds.
+
+    The key is the `key` extra when given, otherwise the unformatted message.
+    Records logged with `extra={"key": None}` are never limited.
+    """
+
+    def __init__(self, interval=1.0):
+        super().__init__()
+        self.interval = interval
+        self._last = {}
+
+    def filter(self, record):
+        key = getattr(record, "key", record.msg)
+        if key is None:
+            return True
+        now = time.monotonic()
+        last = self._last.get(key)
+        if last is not None and now - last < self.interval:
+            return False
+        self._last[key] = now
+        return True
+
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that drops records instead of blocking when the queue is full.
+
+    Records are queued unformatted, so the listener thread does all the work.
+    """
+
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record):
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class Metrics:
+    """Counters and gauges aggregated on a background thread.
+
+    `increment` and `gauge` only queue an event and never block: when the queue
+    is full the event is dropped. Every `interval` seconds the aggregated values
+    are stored in `snapshot()` and logged to the "xenosynth.metrics" logger.
+    Counters are reported per interval together with a `<name>_rate` per second,
+    e.g. "xruns", "control_updates"; gauges report their last value, e.g.
+    "render_load".
+    """
+
+    def __init__(self, maxsize=1024, interval=1.0):
+        self.interval = interval
+        self.dropped = 0
+        self._queue = queue.Queue(maxsize)
+        self._counters = {}
+        self._gauges = {}
+        self._snapshot = {}
+        self._stop = threading.Event()
+        self._thread = None
+
+    def increment(self, name, value=1):
+        self._put(("counter", name, value))
+
+    def gauge(self, name, value):
+        self._put(("gauge", name, value))
+
+    def snapshot(self):
+        return dict(self._snapshot)
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="xenosynth-metrics", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self):
+        if self._thread is None:
+            return
+        self._stop.set()
+        try:
+            self._queue.put_nowait(None)  # wake the thread up
+        except queue.Full:
+            pass
+        self._thread.join()
+        self._thread = None
+
+    def _put(self, event):
+        if self._thread is None:
+            return
+        try:
+            self._queue.put_nowait(event)
+        except queue.Full:
+            self.dropped += 1
+
+    def _apply(self, event):
+        kind, name, value = event
+        if kind == "counter":
+            self._counters[name] = self._counters.get(name, 0) + value
+        else:
+            self._gauges[name] = value
+
+    def _flush(self, elapsed):
+        snapshot = dict(self._gauges)
+        for name, count in self._counters.items():
+            snapshot[name] = count
+            snapshot[f"{name}_rate"] = count / elapsed if elapsed > 0 else 0.0
+        snapshot["metrics_dropped"] = self.dropped
+        if _handler is not None:
+            snapshot["log_dropped"] = _handler.dropped
+        self._counters = dict.fromkeys(self._counters, 0)
+        self._snapshot = snapshot
+        get_logger("metrics").info(
+            "%s",
+            " ".join(f"{name}={value:g}" for name, value in sorted(snapshot.items())),
+            extra={"key": None, "metrics": snapshot},
+        )
+
+    def _run(self):
+        started = time.monotonic()
+        deadline = started + self.interval
+        while not self._stop.is_set():
+            timeout = deadline - time.monotonic()
+            if timeout > 0:
+                try:
+                    event = self._queue.get(timeout=timeout)
+                except queue.Empty:
+                    continue
+                if event is not None:
+                    self._apply(event)
+                continue
+            now = time.monotonic()
+            self._flush(now - started)
+            started, deadline = now, now + self.interval
+
+        while True:  # account for whatever was queued before stop()
+            try:
+                event = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if event is not None:
+                self._apply(event)
+        self._flush(time.monotonic() - started)
+
+
+metrics = Metrics()
+
+_handler = None
+_listener = None
+
+
+def setup_logging(level=logging.INFO, queue_size=1000, rate_limit=1.0, stream=None):
+    """Route the "xenosynth" loggers through a bounded queue to a background thread.
+
+    Logging calls only filter and enqueue the record; formatting and writing to
+    `stream` (stderr by default) happen on the listener thread. Also starts the
+    `metrics` thread. Call `shutdown_logging` to flush and stop both.
+    """
+    global _handler, _listener  # pylint: disable=W0603
+
+    shutdown_logging()
+
+    output = logging.StreamHandler(sys.stderr if stream is None else stream)
+    output.setFormatter(logging.Formatter(LOG_FORMAT))
+
+    _handler = DroppingQueueHandler(queue.Queue(queue_size))
+    _handler.addFilter(RateLimitFilter(rate_limit))
+
+    logger = get_logger()
+    logger.setLevel(level)
+    logger.propagate = False
+    logger.addHandler(_handler)
+
+    _listener = logging.handlers.QueueListener(_handler.queue, output)
+    _listener.start()
+    metrics.start()
+    return _listener
+
+
+def shutdown_logging():
+    global _handler, _listener  # pylint: disable=W0603
+
+    metrics.stop()
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+    if _handler is not None:
+        get_logger().removeHandler(_handler)
+        _handler = None
@@ -0,0 +1,114 @@
+import gc
+import os
+import threading
+
+from utils.logging import get_logger
+
+log = get_logger("realtime")
+
+
+def setup_process(gc_thresholds=None, gc_disable=False):
+    """Keep the cyclic GC away from the audio callback once startup is done.
+
+    Collects and freezes everything allocated during initialization, so later
+    passes never walk it, then either raises the GC thresholds or disables
+    automatic collection entirely. With `gc_disable`, call `collect_in_gap`
+    from a non-audio loop. Returns a report of the settings applied.
+    """
+    gc.collect()
+    gc.freeze()
+    report = {"gc_frozen": gc.get_freeze_count()}
+    if gc_thresholds:
+        gc.set_threshold(*gc_thresholds)
+    report["gc_thresholds"] = gc.get_threshold()
+    if gc_disable:
+        gc.disable()
+    report["gc_enabled"] = gc.isenabled()
+    log.info("process realtime settings: %s", report, extra={"key": None})
+    return report
+
+
+def collect_in_gap():
+    """Run a GC pass from a scheduled gap (e.g. the OLED loop) when GC is paused.
+
+    Mirrors the automatic GC: collects the oldest generation whose count is
+    past its threshold, and generation 0 otherwise, so objects promoted to
+    generations 1 and 2 are still freed on units that run for days.
+    """
+    if gc.isenabled():
+        return 0
+    count, threshold = gc.get_count(), gc.get_threshold()
+    generation = 0
+    if count[2] > threshold[2]:
+        generation = 2
+    elif count[1] > threshold[1]:
+        generation = 1
+    return gc.collect(generation)
+
+
+def set_affinity(cpus):
+    """Pin the calling thread to `cpus`; returns the applied set or the reason it failed."""
+    if not hasattr(os, "sched_setaffinity"):
+        return "unsupported"
+    try:
+        os.sched_setaffinity(0, cpus)
+    except OSError as e:
+        return f"unchanged ({type(e).__name__}: {e})"
+    return sorted(os.sched_getaffinity(0))
+
+
+def set_priority(priority=None, nice=None):
+    """Give the calling thread SCHED_FIFO `priority`, falling back to `nice`.
+
+    Returns a description of what was applied.
+    """
+    errors = []
+    if priority is not None:
+        if hasattr(os, "sched_setscheduler"):
+            try:
+                os.sched_setscheduler(0, os.SCHED_FIFO, os.sched_param(priority))
+                return f"SCHED_FIFO:{priority}"
+            except OSError as e:
+                errors.append(f"SCHED_FIFO {type(e).__name__}")
+        else:
+            errors.append("SCHED_FIFO unsupported")
+    if nice is not None:
+        try:
+            current = os.nice(0)
+            return f"nice:{os.nice(nice - current)}"
+        except OSError as e:
+            errors.append(f"nice {type(e).__name__}")
+    if errors:
+        return f"unchanged ({', '.join(errors)})"
+    return "unchanged"
+
+
+def setup_thread(cpus=None, priority=None, nice=None):
+    """Apply affinity and scheduling settings to the calling thread.
+
+    Missing permissions or platform support are reported, never raised.
+    """
+    report = {"thread": threading.current_thread().name}
+    if cpus:
+        report["affinity"] = set_affinity(cpus)
+    if priority is not None or nice is not None:
+        report["scheduler"] = set_priority(priority, nice)
+    log.info("thread realtime settings: %s", report, extra={"key": None})
+    return report
+
+
+def realtime_callback(callback, cpus=None, priority=None, nice=None):
+    """Wrap an audio callback so the audio thread is set up on its first block.
+
+    The audio thread is created by PortAudio, so this is the only place its
+    settings can be applied. The report is available as `wrapped.report`.
+    """
+    report = {}
+
+    def wrapped(outdata, frames, time_info, status):
+        if not report:
+            report.update(setup_thread(cpus, priority, nice))
+        callback(outdata, frames, time_info, status)
+
+    wrapped.report = report
+    return wrapped